@@ -1,34 +1,44 @@
 from typing import List, Tuple, Dict
+from operator import itemgetter
 import datetime
 
 
 dates = ["Mon", "Tue", "Wed"]
 
 class MeetingGame:
+    __slots__ = ('dates', 'valuations', 'availability', 'max_rounds',
+                 'max_proposals', '_legal', '_payoffs')
+
     def __init__(self, valuations, availability, max_rounds=3):
         self.dates = dates
         self.valuations = valuations            # dict: player -> {date: value}
         self.availability = availability        # dict: player -> [date,...]
         self.max_rounds = max_rounds
         self.max_proposals = max_rounds * 2
+        self._legal = {p: tuple(a) for p, a in availability.items()}
+        # 2-player fast path: date -> (u1,u2), for the dates both players can
+        # propose (only those can be agreed on; valuations may omit the rest)
+        both = set(availability[1]) & set(availability[2])
+        self._payoffs = {d: (valuations[1][d], valuations[2][d]) for d in dates if d in both}
 
     def is_terminal(self, history):
         # terminal if agreement or rounds exhausted
-        if len(history) >= 2 and history[-1][1] == history[-2][1]:
-            return True
-        if len(history) >= self.max_proposals:
-            return True
-        return False
+        n = len(history)
+        return n >= self.max_proposals or (n >= 2 and history[-1][1] == history[-2][1])
 
     def get_payoff(self, history):
-        # returns (u1,u2)
-        if len(history) >= 2 and history[-1] == history[-2]:
+        # returns (u1,u2); agreement means both players proposed the same date
+        if len(history) >= 2 and history[-1][1] == history[-2][1]:
             date = history[-1][1]
-            return self.valuations[1][date], self.valuations[2][date]
+            payoff = self._payoffs.get(date)
+            if payoff is None:
+                # date outside someone's availability: read valuations directly
+                payoff = self.valuations[1][date], self.valuations[2][date]
+            return payoff
         return 0, 0
 
     def legal_actions(self, player):
-        return self.availability[player]
+        return self._legal[player]
     
 class PrisonersDilemmaGame:
     """
@@ -36,8 +46,14 @@ class PrisonersDilemmaGame:
     players choose simultaneously without observing the other's action.
     Actions: 'C' (cooperate) or 'D' (defect).
     """
+    __slots__ = ('payoff_matrix', '_payoffs')
+
+    actions: Tuple[str, ...] = ('C', 'D')
+    _A2I: Dict[str, int] = {'C': 0, 'D': 1}
+    # shared info-set keys for the usual player ids
+    _INFO_SETS: Dict[int, Tuple[int]] = {1: (1,), 2: (2,)}
+
     def __init__(self, payoff_matrix: Dict[Tuple[str, str], Tuple[int, int]] = None):
-        self.actions: List[str] = ['C', 'D']
         # Default payoff matrix: (player1_payoff, player2_payoff)
         self.payoff_matrix = payoff_matrix or {
             ('C', 'C'): (3, 3),
@@ -45,10 +61,15 @@ class PrisonersDilemmaGame:
             ('D', 'C'): (5, 0),
             ('D', 'D'): (1, 1),
         }
+        # _payoffs[i][j]: payoffs when player 1 plays actions[i], player 2 actions[j]
+        self._payoffs = tuple(
+            tuple(self.payoff_matrix[(a1, a2)] for a2 in self.actions)
+            for a1 in self.actions
+        )
 
-    def legal_actions(self, player: int) -> List[str]:
-        """Return the list of available actions for a player."""
-        return self.actions.copy()
+    def legal_actions(self, player: int) -> Tuple[str, ...]:
+        """Return the available actions for a player (shared, read-only)."""
+        return self.actions
 
     def is_terminal(self, history: List[Tuple[int, str]]) -> bool:
         """Check if the game has reached its terminal state (two plays)."""
@@ -58,36 +79,57 @@ class PrisonersDilemmaGame:
         """Return the payoffs for both players given the history of actions."""
         if len(history) != 2:
             raise ValueError("History must contain exactly two actions.")
-        _, action1 = history[0]
-        _, action2 = history[1]
-        return self.payoff_matrix[(action1, action2)]
+        return self._payoffs[self._A2I[history[0][1]]][self._A2I[history[1][1]]]
 
     def get_info_set(self, player: int) -> Tuple[int]:
         """
         Return the information set identifier for a player.
         In a one-shot simultaneous game, the info set is just the player ID.
+        Players 1 and 2 get the same tuple object on every call.
         """
-        return (player,)
+        info_set = self._INFO_SETS.get(player)
+        return info_set if info_set is not None else (player,)
 
 
 # Generate 5 workdays × 8 hourly slots (09:00–17:00)
+HOURS = tuple(f"{h:02d}:00-{h+1:02d}:00" for h in range(9, 17))
+
 def next_workdays(start_date: datetime.date, n: int) -> List[datetime.date]:
-    days = []
-    d = start_date
-    while len(days) < n:
-        d += datetime.timedelta(days=1)
-        if d.weekday() < 5:
-            days.append(d)
-    return days
+    first = start_date + datetime.timedelta(days=1)
+    if first.weekday() >= 5:
+        # roll a weekend over to the following Monday
+        first += datetime.timedelta(days=7 - first.weekday())
+    # the i-th workday counted from that week's Monday is i // 5 weeks + i % 5 days
+    monday = first - datetime.timedelta(days=first.weekday())
+    offset = first.weekday()
+    return [monday + datetime.timedelta(days=7 * (i // 5) + i % 5)
+            for i in range(offset, offset + n)]
 
 def make_time_slots(start_date: datetime.date) -> List[str]:
     workdays = next_workdays(start_date, 5)
-    hours = [f"{h:02d}:00-{h+1:02d}:00" for h in range(9, 17)]
-    return [f"{d.strftime('%a %Y-%m-%d')} {slot}" for d in workdays for slot in hours]
+    return [f"{d.strftime('%a %Y-%m-%d')} {slot}" for d in workdays for slot in HOURS]
 
-SLOTS = make_time_slots(datetime.date.today())  # 40 slots
+SLOTS = tuple(make_time_slots(datetime.date.today()))  # 40 slots
+SLOT_ID = {s: i for i, s in enumerate(SLOTS)}
 typedef = Tuple[int, str]
+
+def last_n_agree(history: List[typedef], n: int) -> bool:
+    """
+    True if the last n proposals all name the same slot. Walks back from
+    the end and stops at the first mismatch, without slicing history.
+    """
+    if len(history) < n:
+        return False
+    slot = history[-1][1]
+    for i in range(2, n + 1):
+        if history[-i][1] != slot:
+            return False
+    return True
+
 class MeetingGame40:
+    __slots__ = ('players', 'dates', 'valuations', 'availability', 'max_rounds',
+                 'max_proposals', '_legal', '_payoffs', '_zero_payoff')
+
     def __init__(self,
                  players: List[int],
                  valuations: Dict[int, Dict[str, float]],
@@ -99,28 +141,41 @@ class MeetingGame40:
         self.availability = availability
         self.max_rounds = max_rounds
         self.max_proposals = max_rounds * len(players)
+        self._legal = {p: tuple(a) for p, a in availability.items()}
+        # slot -> payoff tuple, for every slot someone can propose
+        # (valuations may leave the other slots out)
+        self._payoffs = {s: tuple(valuations[p][s] for p in players)
+                         for a in availability.values() for s in a}
+        self._zero_payoff = tuple(0.0 for _ in players)
 
     def is_terminal(self, history: List[typedef]) -> bool:
-        if len(history) >= len(self.players):
-            last_cycle = history[-len(self.players):]
-            # unanimous slot and one proposal per player
-            slots = [d for (_, d) in last_cycle]
-            ppl   = [p for (p, _) in last_cycle]
-            if len(set(ppl)) == len(self.players) and len(set(slots)) == 1:
-                return True
+        N = len(self.players)
+        # unanimous slot and one proposal per player
+        if last_n_agree(history, N) and \
+                len({history[-i][0] for i in range(1, N + 1)}) == N:
+            return True
         return len(history) >= self.max_proposals
 
     def get_payoff(self, history: List[typedef]) -> Tuple[float, ...]:
         if self.is_terminal(history):
             slot = history[-1][1]
-            return tuple(self.valuations[p][slot] for p in self.players)
-        return tuple(0.0 for _ in self.players)
+            payoff = self._payoffs.get(slot)
+            if payoff is None:
+                # slot outside every availability list: read valuations directly
+                payoff = tuple(self.valuations[p][slot] for p in self.players)
+            return payoff
+        return self._zero_payoff
 
-    def legal_actions(self, player: int) -> List[str]:
-        return self.availability[player]
+    def legal_actions(self, player: int) -> Tuple[str, ...]:
+        return self._legal[player]
 
 
 class MeetingGamePerfect40:
+    __slots__ = ('players', 'dates', 'valuations', 'availability', 'max_rounds',
+                 'max_proposals', 'unanimous_bonus', '_legal',
+                 '_unanimous_payoffs', '_majority_payoffs', '_zero_payoff',
+                 '_is_terminal', '_get_payoff')
+
     def __init__(self,
                  players: List[int],
                  dates: List[str],
@@ -135,6 +190,70 @@ class MeetingGamePerfect40:
         self.max_rounds = max_rounds
         self.max_proposals = max_rounds * len(players)
         self.unanimous_bonus = unanimous_bonus
+        # slot -> payoff tables, for every slot someone can propose
+        # (valuations may leave the other slots out)
+        self._legal = {p: tuple(a) for p, a in availability.items()}
+        values = {s: tuple(valuations[p][s] for p in players)
+                  for a in availability.values() for s in a}
+        self._unanimous_payoffs = {s: tuple(v + unanimous_bonus for v in vals)
+                                   for s, vals in values.items()}
+        # _majority_payoffs[count][slot]: valuations scaled by count / N
+        N = len(players)
+        self._majority_payoffs = [
+            {s: tuple(v * (count / N) for v in vals) for s, vals in values.items()}
+            for count in range(N + 1)
+        ]
+        self._zero_payoff = tuple(0.0 for _ in players)
+        self._specialize()
+
+    def _specialize(self):
+        """
+        Generate is_terminal/get_payoff bodies with N and max_proposals
+        inlined as literals and the last-N agreement check unrolled
+        (e.g. h[-1][1] == h[-2][1] == h[-3][1] for three players).
+        """
+        N, M = len(self.players), self.max_proposals
+        agree = " == ".join(f"h[-{i}][1]" for i in range(1, N + 1)) if N > 1 else "True"
+        src = (
+            f"def is_terminal(h):\n"
+            f"    n = len(h)\n"
+            f"    return n >= {M} or (n >= {N} and {agree})\n"
+            f"def get_payoff(h):\n"
+            f"    n = len(h)\n"
+            f"    if n >= {N} and {agree}:\n"
+            f"        payoff = unanimous.get(h[-1][1])\n"
+            f"        return payoff if payoff is not None else unlisted(h[-1][1], 1.0, bonus)\n"
+            f"    if n >= {M}:\n"
+            f"        return majority(h)\n"
+            f"    return zero\n"
+        )
+        ns = {
+            "unanimous": self._unanimous_payoffs,
+            "majority": self._majority_payoff,
+            "unlisted": self._unlisted_payoff,
+            "bonus": self.unanimous_bonus,
+            "zero": self._zero_payoff,
+        }
+        exec(src, ns)
+        self._is_terminal = ns["is_terminal"]
+        self._get_payoff = ns["get_payoff"]
+
+    def _majority_payoff(self, history: List[typedef]) -> Tuple[float, ...]:
+        N = len(self.players)
+        counts: Dict[str, int] = {}
+        for i in range(N, 0, -1):
+            slot = history[-i][1]
+            counts[slot] = counts.get(slot, 0) + 1
+        # max() keeps the first slot seen on ties, like most_common(1)
+        majority_slot, count = max(counts.items(), key=itemgetter(1))
+        payoff = self._majority_payoffs[count].get(majority_slot)
+        if payoff is None:
+            return self._unlisted_payoff(majority_slot, count / N, 0.0)
+        return payoff
+
+    def _unlisted_payoff(self, slot: str, scale: float, bonus: float) -> Tuple[float, ...]:
+        # slot outside every availability list: read valuations directly
+        return tuple(self.valuations[p][slot] * scale + bonus for p in self.players)
 
     def is_terminal(self, history: List[typedef]) -> bool:
         """
@@ -142,14 +261,7 @@ class MeetingGamePerfect40:
         - unanimous agreement in the last round, or
         - reached maximum number of proposals
         """
-        N = len(self.players)
-        # unanimous agreement in the last N moves
-        if len(history) >= N:
-            last = history[-N:]
-            if len({d for (_, d) in last}) == 1:
-                return True
-        # reached the proposal limit
-        return len(history) >= self.max_proposals
+        return self._is_terminal(history)
 
     def get_payoff(self, history: List[typedef]) -> Tuple[float, ...]:
         """
@@ -158,29 +270,11 @@ class MeetingGamePerfect40:
         2) If max rounds reached without full agreement, reward based on majority slot proportion.
         3) Otherwise, game is ongoing and payoff is all zeros.
         """
-        N = len(self.players)
-        # 1) unanimous agreement
-        if len(history) >= N:
-            last = history[-N:]
-            slots = [d for (_, d) in last]
-            if len(set(slots)) == 1:
-                slot = slots[0]
-                return tuple(self.valuations[p][slot] + self.unanimous_bonus
-                             for p in self.players)
-        # 2) max proposals reached without unanimous
-        if len(history) >= self.max_proposals:
-            last = history[-N:]
-            slots = [d for (_, d) in last]
-            counts = Counter(slots)
-            majority_slot, count = counts.most_common(1)[0]
-            proportion = count / N
-            return tuple(self.valuations[p][majority_slot] * proportion
-                         for p in self.players)
-        # 3) non-terminal
-        return tuple(0.0 for _ in self.players)
-
-    def legal_actions(self, player: int) -> List[str]:
+        return self._get_payoff(history)
+
+    def legal_actions(self, player: int) -> Tuple[str, ...]:
         """
-        Return the list of available time slots for the given player.
+        Return the available time slots for the given player.
+        The tuple is shared between calls; callers must not mutate it.
         """
-        return self.availability[player]
\ No newline at end of file
+        return self._legal[player]
\ No newline at end of file
@@ -1,19 +1,179 @@
-from openai import OpenAI
+from typing import Dict, List, Optional, OrderedDict, Tuple
+from functools import lru_cache
+import hashlib
 import os
 
+# openai and asyncio are imported where they are used, so importing a
+# solver (which imports this module) does not load the SDK until an LLM
+# call is actually made.
+
+MODEL = "gpt-4.1-nano"
+TEMPERATURE = 0.7
+MAX_TOKENS = 512
+DEFAULT_SYSTEM_PROMPT = "You are a strategic decision-making agent."
+
+# Set CHATGAME_LLM_CACHE to a file path to keep replies across runs
+CACHE_PATH = os.getenv("CHATGAME_LLM_CACHE")
+
+# (system_prompt, prompt) -> reply, shared by ask_llm and ask_llm_batch;
+# least recently used entries are dropped past MEMORY_CACHE_SIZE
+MEMORY_CACHE_SIZE = 4096
+_responses: OrderedDict[Tuple[str, str], str] = OrderedDict()
+
+
+@lru_cache(maxsize=1)
+def _client():
+    # built on first use and reused, so every call shares one HTTP session
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def _async_client():
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+@lru_cache(maxsize=1)
+def _loop():
+    # one event loop for every batch: the async client's pooled connections
+    # belong to the loop that opened them, so asyncio.run's fresh loop per
+    # call would not be able to reuse them
+    import asyncio
+    return asyncio.new_event_loop()
+
+
+@lru_cache(maxsize=1)
+def _disk_cache():
+    if not CACHE_PATH:
+        return None
+    import sqlite3
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT)")
+    return conn
+
+
+def _disk_key(system_prompt: str, prompt: str) -> str:
+    # model and sampling settings are part of the key, so changing them
+    # does not serve replies produced under the old ones
+    raw = "\0".join((MODEL, str(TEMPERATURE), str(MAX_TOKENS), system_prompt, prompt))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _cached(system_prompt: str, prompt: str) -> Optional[str]:
+    key = (system_prompt, prompt)
+    if key in _responses:
+        _responses.move_to_end(key)
+        return _responses[key]
+    db = _disk_cache()
+    if db is None:
+        return None
+    row = db.execute("SELECT content FROM responses WHERE key = ?",
+                     (_disk_key(system_prompt, prompt),)).fetchone()
+    if row is None:
+        return None
+    _memorize(key, row[0])
+    return row[0]
+
+
+def _memorize(key: Tuple[str, str], content: str):
+    _responses[key] = content
+    _responses.move_to_end(key)
+    if len(_responses) > MEMORY_CACHE_SIZE:
+        _responses.popitem(last=False)
+
+
+def _remember(system_prompt: str, prompt: str, content: str):
+    _memorize((system_prompt, prompt), content)
+    db = _disk_cache()
+    if db is not None:
+        with db:
+            db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?)",
+                       (_disk_key(system_prompt, prompt), content))
+
+
+def _messages(prompt: str, system_prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt},
+    ]
+
 
 def ask_llm(
     prompt: str,
-    system_prompt: str = "You are a strategic decision-making agent."
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    use_cache: Optional[bool] = None
 ) -> str:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    completion = client.chat.completions.create(
-        model="gpt-4.1-nano",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.7,
-        max_tokens=512,
+    """
+    Ask one prompt and return the reply text.
+    With use_cache=True a prompt asked before returns the stored reply
+    instead of a new sample, so repeated prompts always get the same
+    answer despite TEMPERATURE. The default (None) caches only when
+    CHATGAME_LLM_CACHE is set; otherwise every call samples afresh.
+    """
+    if use_cache is None:
+        use_cache = bool(CACHE_PATH)
+    if use_cache:
+        content = _cached(system_prompt, prompt)
+        if content is not None:
+            return content
+    completion = _client().chat.completions.create(
+        model=MODEL,
+        messages=_messages(prompt, system_prompt),
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
     )
-    return completion.choices[0].message.content
\ No newline at end of file
+    content = completion.choices[0].message.content
+    if use_cache:
+        _remember(system_prompt, prompt, content)
+    return content
+
+
+def ask_llm_batch(
+    prompts: List[str],
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT,
+    use_cache: Optional[bool] = None
+) -> List[str]:
+    """
+    Ask several prompts at once. Uncached prompts are sent concurrently,
+    so the batch costs roughly one round-trip instead of one per prompt.
+    Replies are returned in the order of `prompts`. use_cache works as in
+    ask_llm; with caching on, a prompt repeated within the batch is sent
+    once, otherwise every entry gets its own sample.
+    """
+    import asyncio
+
+    if use_cache is None:
+        use_cache = bool(CACHE_PATH)
+    if not use_cache:
+        pending = list(prompts)
+    else:
+        replies: Dict[str, str] = {}
+        pending = []
+        for p in dict.fromkeys(prompts):
+            content = _cached(system_prompt, p)
+            if content is None:
+                pending.append(p)
+            else:
+                replies[p] = content
+
+    async def fetch_all() -> List[str]:
+        client = _async_client()
+        completions = await asyncio.gather(*(
+            client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(p, system_prompt),
+                temperature=TEMPERATURE,
+                max_tokens=MAX_TOKENS,
+            )
+            for p in pending
+        ))
+        return [c.choices[0].message.content for c in completions]
+
+    contents = _loop().run_until_complete(fetch_all()) if pending else []
+    if not use_cache:
+        return contents
+    for p, content in zip(pending, contents):
+        replies[p] = content
+        _remember(system_prompt, p, content)
+    return [replies[p] for p in prompts]
@@ -1,7 +1,7 @@
 from typing import List, Tuple, Dict
-from collections import defaultdict
 from random import choices as _choices
 from llm import ask_llm
+from sampling import sample_index
 
 
 # Define the meeting game for N players
@@ -25,18 +25,20 @@ class MCCFRSolver:
     def __init__(self, game, iterations: int = 2000):
         self.game = game
         self.iterations = iterations
-        # regret_sum and strategy_sum per player info-set
-        self.regret_sum = {p: defaultdict(lambda: {d: 0.0 for d in game.dates})
-                           for p in game.players}
-        self.strategy_sum = {p: defaultdict(lambda: {d: 0.0 for d in game.dates})
-                             for p in game.players}
-
-    def regret_matching(self, regrets: Dict[str, float], legal: List[str]) -> Dict[str, float]:
-        pos = {a: max(regrets[a], 0.0) for a in legal}
-        total = sum(pos.values())
+        # acting player at each history length (round-robin, until max_proposals)
+        self.turn_order = tuple(game.players[i % len(game.players)]
+                                for i in range(game.max_proposals))
+        # per player: info set -> sums, one float per legal action
+        # (same order as game.legal_actions)
+        self.regret_sum: Dict[int, Dict[Tuple, List[float]]] = {p: {} for p in game.players}
+        self.strategy_sum: Dict[int, Dict[Tuple, List[float]]] = {p: {} for p in game.players}
+
+    def regret_matching(self, regrets: List[float]) -> List[float]:
+        pos = [r if r > 0.0 else 0.0 for r in regrets]
+        total = sum(pos)
         if total > 0:
-            return {a: pos[a]/total for a in legal}
-        return {a: 1.0/len(legal) for a in legal}
+            return [r/total for r in pos]
+        return [1.0/len(regrets)] * len(regrets)
 
     def mc_cfr(self,
                history: List[typedef],
@@ -47,41 +49,50 @@ class MCCFRSolver:
             return self.game.get_payoff(history)
 
         # Determine current player by round-robin
-        current = self.game.players[len(history) % len(self.game.players)]
+        current = self.turn_order[len(history)]
         legal = self.game.legal_actions(current)
         info_set = (current, tuple(history))
-        strategy = self.regret_matching(self.regret_sum[current][info_set], legal)
+        regrets = self.regret_sum[current].get(info_set)
+        if regrets is None:
+            regrets = self.regret_sum[current][info_set] = [0.0] * len(legal)
+        strategy = self.regret_matching(regrets)
 
         # Sampling node vs. others
         if current == sampling_player:
             # Full expand for sampling player
-            util = {}
+            util = [0.0] * len(legal)
             node_util = {p: 0.0 for p in self.game.players}
-            for a in legal:
-                next_hist = history + [(current, a)]
+            for i, a in enumerate(legal):
                 # update reach probabilities
                 p_next = p_reach.copy()
-                p_next[current] *= strategy[a]
-                payoffs = self.mc_cfr(next_hist, p_next, sampling_player)
-                util[a] = payoffs[current - 1]
+                p_next[current] *= strategy[i]
+                history.append((current, a))
+                payoffs = self.mc_cfr(history, p_next, sampling_player)
+                history.pop()
+                util[i] = payoffs[current - 1]
                 for p_idx, payoff in zip(self.game.players, payoffs):
-                    node_util[p_idx] += strategy[a] * payoff
+                    node_util[p_idx] += strategy[i] * payoff
             # Regret and strategy sum updates for sampling player
             opp_reach = product([p_reach[p] for p in self.game.players if p != current])
-            for a in legal:
-                r = util[a] - node_util[current]
-                self.regret_sum[current][info_set][a] += opp_reach * r
-                self.strategy_sum[current][info_set][a] += p_reach[current] * strategy[a]
+            own_reach = p_reach[current]
+            own_util = node_util[current]
+            strat_sum = self.strategy_sum[current].get(info_set)
+            if strat_sum is None:
+                strat_sum = self.strategy_sum[current][info_set] = [0.0] * len(legal)
+            for i in range(len(legal)):
+                regrets[i] += opp_reach * (util[i] - own_util)
+                strat_sum[i] += own_reach * strategy[i]
             # return expected payoffs
             return tuple(node_util[p] for p in self.game.players)
         else:
             # Sample an action for non-sampling players
-            probs = [strategy[a] for a in legal]
-            a = _choices(legal, probs)[0]
-            next_hist = history + [(current, a)]
+            i = sample_index(strategy)
             p_reach_next = p_reach.copy()
-            p_reach_next[current] *= strategy[a]
-            return self.mc_cfr(next_hist, p_reach_next, sampling_player)
+            p_reach_next[current] *= strategy[i]
+            history.append((current, legal[i]))
+            payoffs = self.mc_cfr(history, p_reach_next, sampling_player)
+            history.pop()
+            return payoffs
 
     def train(self):
         # initialize reach proba
@@ -94,11 +105,11 @@ class MCCFRSolver:
     def get_avg_strategy(self) -> Dict[int, Dict[Tuple, Dict[str, float]]]:
         avg = {p: {} for p in self.game.players}
         for p in self.game.players:
+            legal = self.game.legal_actions(p)
             for I, strat_sum in self.strategy_sum[p].items():
-                legal = self.game.legal_actions(p)
-                total = sum(strat_sum[a] for a in legal)
+                total = sum(strat_sum)
                 if total > 0:
-                    avg[p][I] = {a: strat_sum[a]/total for a in legal}
+                    avg[p][I] = {a: s/total for a, s in zip(legal, strat_sum)}
                 else:
                     avg[p][I] = {a: 1.0/len(legal) for a in legal}
         return avg
@@ -111,22 +122,27 @@ def sample_from_strategy(strategy: Dict[str, float]) -> str:
     actions, probs = zip(*strategy.items())
     return _choices(actions, probs)[0]
 
+def format_valuations(valuations: Dict[str, float]) -> str:
+    """Format a player's valuation block for build_prompt."""
+    lines = ["Your valuations:"]
+    for slot, val in valuations.items():
+        lines.append(f"  {slot}: {val}")
+    return "\n".join(lines)
+
 def build_prompt(
     history: List[typedef],
     times_avail: Dict[str, int],
-    valuations: Dict[str, float],
+    valuation_block: str,
     suggestion: str,
     player: int
 ) -> str:
-    lines = ["History:"]
+    lines = [valuation_block]
+    lines.append("\nHistory:")
     for p, d in history:
         lines.append(f"  Player {p} proposed {d}")
     lines.append("\nYour availability:")
     for slot, avail in times_avail.items():
         lines.append(f"  {slot}: {'Yes' if avail else 'No'}")
-    lines.append("\nYour valuations:")
-    for slot, val in valuations.items():
-        lines.append(f"  {slot}: {val}")
     lines.append(f"\nSolver guidance: propose {suggestion}")
     lines.append("\nIMPORTANT: Reply with exactly one line in the form:")
     lines.append("  Proposed-Date: <slot>")
@@ -137,14 +153,17 @@ def chat_with_solver(
     history: List[typedef],
     avg_strategy: Dict[int, Dict[Tuple, Dict[str, float]]],
     game,
-    player_id: int
+    player_id: int,
+    valuation_block: str = None
 ) -> str:
     # prepare state
-    times_avail = {s: int(all(h[1] != s for h in history)) for s in game.dates}
-    valuations = game.valuations[player_id]
+    proposed = {d for (_, d) in history}
+    times_avail = {s: int(s not in proposed) for s in game.dates}
+    if valuation_block is None:
+        valuation_block = format_valuations(game.valuations[player_id])
     I = (player_id, tuple(history))
     strat = avg_strategy[player_id].get(I, uniform_strategy(game.legal_actions(player_id)))
     suggestion = sample_from_strategy(strat)
-    prompt = build_prompt(history, times_avail, valuations, suggestion, player_id)
+    prompt = build_prompt(history, times_avail, valuation_block, suggestion, player_id)
     content = ask_llm(prompt, system_prompt="You are a strategic meeting assistant.")
     return content
@@ -1,21 +1,44 @@
-from collections import defaultdict
-from game import dates
 from llm import ask_llm  # Assuming you have a module for LLM interactions
+from sampling import sample_index
 
 
 class CFRSolver:
-    def __init__(self, game, iterations=5000):
+    METHODS = ("vanilla", "external-sampling")
+
+    def __init__(self, game, iterations=5000, method="vanilla", cfr_plus=False):
+        """
+        method="vanilla" walks the full tree every iteration.
+        method="external-sampling" (MCCFR) alternates the traverser each
+        iteration, expands only its actions and samples the opponent's,
+        so one iteration costs a single path per opponent node.
+        cfr_plus=True applies the CFR+ update with either method: regrets
+        are floored at zero and iteration t adds to the average strategy
+        with weight t, which lowers exploitability for the same iterations.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown CFR method: {method!r}")
         self.game = game
         self.iterations = iterations
-        self.regret_sum = defaultdict(lambda: {d:0.0 for d in dates})
-        self.strategy_sum = defaultdict(lambda: {d:0.0 for d in dates})
+        self.method = method
+        self.cfr_plus = cfr_plus
+        self._weight = 1  # average-strategy weight of the current iteration
+        # info set -> sums, one float per legal action (same order as legal_actions)
+        self.regret_sum = {}
+        self.strategy_sum = {}
+
+    def _rows(self, I, n):
+        regrets = self.regret_sum.get(I)
+        if regrets is None:
+            regrets = self.regret_sum[I] = [0.0] * n
+            self.strategy_sum[I] = [0.0] * n
+        return regrets, self.strategy_sum[I]
 
-    def regret_matching(self, regrets, legal):
-        pos = {a: max(regrets[a],0) for a in legal}
-        total = sum(pos.values())
+    def regret_matching(self, regrets):
+        pos = [r if r>0 else 0 for r in regrets]
+        total = sum(pos)
         if total>0:
-            return {a:pos[a]/total for a in legal}
-        return {a:1/len(legal) for a in legal}
+            return [r/total for r in pos]
+        return [1/len(regrets)] * len(regrets)
 
     def cfr(self, history, p1, p2):
         if self.game.is_terminal(history):
@@ -23,41 +46,83 @@ class CFRSolver:
         player = 1 if len(history)%2==0 else 2
         I = (player, tuple(history))
         legal = self.game.legal_actions(player)
-        strategy = self.regret_matching(self.regret_sum[I], legal)
+        regrets, strat_sum = self._rows(I, len(legal))
+        strategy = self.regret_matching(regrets)
 
-        util = {}
+        util = [0.0] * len(legal)
         node_util = 0
         node_util_other = 0
-        for a, prob in strategy.items():
-            next_hist = history + [(player,a)]
+        for i, (a, prob) in enumerate(zip(legal, strategy)):
+            # extend history in place and backtrack after the subtree
+            history.append((player,a))
             if player==1:
-                u1,u2 = self.cfr(next_hist, p1*prob, p2)
+                u1,u2 = self.cfr(history, p1*prob, p2)
             else:
-                u1,u2 = self.cfr(next_hist, p1, p2*prob)
-            util[a] = u1 if player==1 else u2
-            node_util += prob * util[a]
+                u1,u2 = self.cfr(history, p1, p2*prob)
+            history.pop()
+            util[i] = u1 if player==1 else u2
+            node_util += prob * util[i]
             node_util_other += prob * (u2 if player==1 else u1)
 
-        for a in legal:
-            regret = util[a] - node_util
-            opp_reach = p2 if player==1 else p1
-            self.regret_sum[I][a] += opp_reach * regret
-            self.strategy_sum[I][a] += (p1 if player==1 else p2) * strategy[a]
+        opp_reach, own_reach = (p2, p1) if player==1 else (p1, p2)
+        own_reach *= self._weight
+        for i in range(len(legal)):
+            regrets[i] += opp_reach * (util[i] - node_util)
+            strat_sum[i] += own_reach * strategy[i]
+        if self.cfr_plus:
+            regrets[:] = [r if r>0 else 0.0 for r in regrets]
 
         return (node_util, node_util_other)
 
+    def external_sampling_cfr(self, history, traverser):
+        if self.game.is_terminal(history):
+            return self.game.get_payoff(history)[traverser-1]
+        player = 1 if len(history)%2==0 else 2
+        I = (player, tuple(history))
+        legal = self.game.legal_actions(player)
+        regrets, strat_sum = self._rows(I, len(legal))
+        strategy = self.regret_matching(regrets)
+
+        if player==traverser:
+            # expand every action of the traverser
+            util = [0.0] * len(legal)
+            for i, a in enumerate(legal):
+                history.append((player,a))
+                util[i] = self.external_sampling_cfr(history, traverser)
+                history.pop()
+            node_util = sum(p*u for p, u in zip(strategy, util))
+            for i in range(len(legal)):
+                regrets[i] += util[i] - node_util
+            if self.cfr_plus:
+                regrets[:] = [r if r>0 else 0.0 for r in regrets]
+            return node_util
+
+        # opponent: accumulate its average strategy and sample one action
+        for i in range(len(legal)):
+            strat_sum[i] += self._weight * strategy[i]
+        i = sample_index(strategy)
+        history.append((player,legal[i]))
+        u = self.external_sampling_cfr(history, traverser)
+        history.pop()
+        return u
+
     def train(self):
-        for _ in range(self.iterations):
-            self.cfr([],1,1)
+        for t in range(self.iterations):
+            if self.cfr_plus:
+                self._weight = t + 1
+            if self.method=="external-sampling":
+                self.external_sampling_cfr([], 1 + t%2)
+            else:
+                self.cfr([],1,1)
 
     def get_avg_strategy(self):
         avg = {}
         for I, strat_sum in self.strategy_sum.items():
-            total = sum(strat_sum.values())
+            legal = self.game.legal_actions(I[0])
+            total = sum(strat_sum)
             if total>0:
-                avg[I] = {a:strat_sum[a]/total for a in self.game.legal_actions(I[0])}
+                avg[I] = {a:s/total for a, s in zip(legal, strat_sum)}
             else:
-                legal = self.game.legal_actions(I[0])
                 avg[I] = {a:1/len(legal) for a in legal}
         return avg
     
@@ -77,7 +142,8 @@ def build_prompt(times_available, day_vals, suggestion, sender="Bob", receiver="
 
 def chat_with_solver(history, avg_strategy, game_state, player_id):
     # Prepare state for prompt
-    ta = {d: (0 if any(h[1]==d for h in history) else 1) for d in game_state.dates}
+    proposed = {h[1] for h in history}
+    ta = {d: (0 if d in proposed else 1) for d in game_state.dates}
     dv = game_state.valuations[player_id]
     info_set = (player_id, tuple(history))
     # Fallback to uniform if no precomputed strategy
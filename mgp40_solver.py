@@ -36,11 +36,13 @@ class MCTSSolver:
         self.game = game
         self.iterations = iterations
         self.c = c
+        self.turn_order = tuple(game.players[i % len(game.players)]
+                                for i in range(game.max_proposals))
 
     def tree_policy(self, node: MCTSNode) -> MCTSNode:
         # 向下展开或选择直到终端
         while not self.game.is_terminal(node.history):
-            current = self.game.players[len(node.history) % len(self.game.players)]
+            current = self.turn_order[len(node.history)]
             legal = self.game.legal_actions(current)
             # 如果还有动作未扩展，先扩展一个
             if len(node.children) < len(legal):
@@ -73,17 +75,23 @@ class MCTSSolver:
 
     def simulate(self, history: List[typedef]) -> Tuple[float, ...]:
         h = history[:]
-        while not self.game.is_terminal(h):
-            current = self.game.players[len(h) % len(self.game.players)]
-            a = random.choice(self.game.legal_actions(current))
-            h.append((current, a))
+        # bind the per-step lookups once for the whole rollout
+        is_terminal = self.game.is_terminal
+        legal_actions = self.game.legal_actions
+        turn_order = self.turn_order
+        choice = random.choice
+        append = h.append
+        while not is_terminal(h):
+            current = turn_order[len(h)]
+            append((current, choice(legal_actions(current))))
         return self.game.get_payoff(h)
 
     def backpropagate(self, node: MCTSNode, payoff: Tuple[float, ...]):
+        player_payoffs = tuple(zip(self.game.players, payoff))
         while node is not None:
             node.visits += 1
-            for i, p in enumerate(self.game.players):
-                node.total_value[p] += payoff[i]
+            for p, v in player_payoffs:
+                node.total_value[p] += v
             node = node.parent
 
     def solve(self) -> Tuple[List[typedef], Tuple[float, ...]]:
@@ -113,27 +121,17 @@ def sample_from_strategy(strategy: Dict[str, float]) -> str:
     actions, probs = zip(*strategy.items())
     return _choices(actions, probs)[0]
 
-def build_prompt(
-    history: List[typedef],
+def format_public_info(
     all_avail: Dict[int, List[str]],
-    all_vals: Dict[int, Dict[str, float]],
-    suggestion: str,
-    player: int
+    all_vals: Dict[int, Dict[str, float]]
 ) -> str:
     """
-    Construct a prompt for the LLM including:
-      - the proposal history,
-      - public availability for each player,
-      - public valuations for each player,
-      - optional solver guidance, and
-      - strict reply format instructions.
+    Format the public availability and valuation blocks. Neither changes
+    during a match, so a chat loop can build this once and pass it to
+    every turn.
     """
-    lines = ["History:"]
-    for p, d in history:
-        lines.append(f"  Player {p} proposed {d}")
-    
     # Public availability for all players
-    lines.append("\nPublic availability:")
+    lines = ["Public availability:"]
     for p, avail_list in all_avail.items():
         slots = ', '.join(avail_list)
         lines.append(f"  Player {p}: {slots}")
@@ -148,6 +146,30 @@ def build_prompt(
             items = items[:top_n]
         formatted = ', '.join(f"{slot}({value})" for slot, value in items)
         lines.append(f"  Player {p}: {formatted}")
+    return "\n".join(lines)
+
+def build_prompt(
+    history: List[typedef],
+    public_info: str,
+    suggestion: str,
+    player: int
+) -> str:
+    """
+    Construct a prompt for the LLM including:
+      - public availability for each player,
+      - public valuations for each player,
+      - the proposal history,
+      - optional solver guidance, and
+      - strict reply format instructions.
+    The public blocks (public_info, from format_public_info) do not change
+    during a match and come first, so consecutive prompts share a prefix
+    that provider-side prompt caching can reuse.
+    """
+    lines = [public_info]
+
+    lines.append("\nHistory:")
+    for p, d in history:
+        lines.append(f"  Player {p} proposed {d}")
     
     # If the solver has a suggestion, include it
     if suggestion:
@@ -164,16 +186,18 @@ def chat_with_solver(
     game,
     player_id: int,
     solver = None,
+    public_info: str = None,
 ) -> str:
     # prepare state
     if solver != None:
         suggestion = solver[player_id]
     else:
         suggestion = ""
+    if public_info is None:
+        public_info = format_public_info(game.availability, game.valuations)
     prompt = build_prompt(
         history,
-        all_avail=game.availability,
-        all_vals=game.valuations,
+        public_info=public_info,
         suggestion=suggestion,
         player=player_id
     )
@@ -11,9 +11,9 @@ class StrictDominanceSolver:
         self.game = game
         # Default players are 1 and 2
         self.players: List[int] = players or [1, 2]
-        # Initialize remaining strategies
+        # Initialize remaining strategies (own copies: run() removes from them)
         self.strategies: Dict[int, List[str]] = {
-            p: game.legal_actions(p) for p in self.players
+            p: list(game.legal_actions(p)) for p in self.players
         }
         # Record of eliminated strategies
         self.elimination_history: List[Tuple[int, str]] = []
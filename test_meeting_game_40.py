@@ -1,8 +1,10 @@
 
 import re
 from typing import List
-from game import MeetingGame40, typedef, SLOTS
-from mg40_solver import MCCFRSolver, chat_with_solver, is_agreement
+from game import MeetingGame40, typedef, SLOTS, SLOT_ID
+from mg40_solver import MCCFRSolver, chat_with_solver, format_valuations, is_agreement
+
+PROPOSED_DATE_RE = re.compile(r"^Proposed-Date:\s*(.+)$", re.MULTILINE)
 
 
 if __name__ == "__main__":
@@ -24,17 +26,20 @@ if __name__ == "__main__":
     solver.train()
     avg_strategy = solver.get_avg_strategy()
 
+    valuation_blocks = {p: format_valuations(valuations[p]) for p in players}
+
     history: List[typedef] = []
     agreed = False
     for turn in range(game.max_proposals):
         player = players[turn % len(players)]
-        reply = chat_with_solver(history, avg_strategy, game, player)
+        reply = chat_with_solver(history, avg_strategy, game, player,
+                                 valuation_blocks[player])
         print(f"Player {player} -> {reply}\n")
-        m = re.search(r"^Proposed-Date:\s*(.+)$", reply, re.MULTILINE)
+        m = PROPOSED_DATE_RE.search(reply)
         if not m:
             raise ValueError(f"Cannot parse proposal from:\n{reply}")
         proposed = m.group(1).strip()
-        if proposed not in SLOTS:
+        if proposed not in SLOT_ID:
             raise ValueError(f"Invalid slot: {proposed}")
         history.append((player, proposed))
         # check unanimous last cycle
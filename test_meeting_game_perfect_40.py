@@ -1,10 +1,12 @@
 
 import re
 from typing import List
-from game import MeetingGamePerfect40, typedef, SLOTS
-from mgp40_solver import MCTSSolver, chat_with_solver, is_agreement
+from game import MeetingGamePerfect40, typedef, SLOTS, SLOT_ID
+from mgp40_solver import MCTSSolver, chat_with_solver, format_public_info, is_agreement
 import datetime
 
+PROPOSED_DATE_RE = re.compile(r"^Proposed-Date:\s*(.+)$", re.MULTILINE)
+
 
 if __name__ == "__main__":
     def make_slots():
@@ -37,17 +39,19 @@ if __name__ == "__main__":
     for p, slot in best_path:
         solver_result[p] = slot
         
+    public_info = format_public_info(availability, valuations)
+
     history: List[typedef] = []
     agreed = False
     for turn in range(game.max_proposals):
         player = players[turn % len(players)]
-        reply = chat_with_solver(history, game, player, solver_result)
+        reply = chat_with_solver(history, game, player, solver_result, public_info)
         print(f"Player {player} -> {reply}\n")
-        m = re.search(r"^Proposed-Date:\s*(.+)$", reply, re.MULTILINE)
+        m = PROPOSED_DATE_RE.search(reply)
         if not m:
             raise ValueError(f"Cannot parse proposal from:\n{reply}")
         proposed = m.group(1).strip()
-        if proposed not in SLOTS:
+        if proposed not in SLOT_ID:
             raise ValueError(f"Invalid slot: {proposed}")
         history.append((player, proposed))
         # check unanimous last cycle